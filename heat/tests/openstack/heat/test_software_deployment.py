@@ -13,13 +13,19 @@
 
 import contextlib
 import copy
+import itertools
+import pickle
 import re
 import uuid
 
-import mock
-import six
+try:
+    from unittest import mock
+except ImportError:
+    import mock
 
 from oslo_serialization import jsonutils
+from swiftclient import client as swiftclient
+from zaqarclient.queues.v2 import client as zaqarclient
 
 from heat.common import exception as exc
 from heat.common.i18n import _
@@ -36,173 +42,431 @@ from heat.engine import template
 from heat.tests import common
 from heat.tests import utils
 
-
-class SoftwareDeploymentTest(common.HeatTestCase):
-
-    template = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar'},
-                }
+_STACK_NAME = 'software_deployment_test_stack'
+_STACK_ID = '42f6f66b-631a-44e7-8d01-e22fb54574a9'
+_PROJECT_ID = '65728b74-cfe7-4f17-9c15-11d4f686e591'
+
+# Fixed, distinct UUIDs for tests that only need some valid resource UUID
+# or object name, so they do not read from the system entropy source.
+_UUIDS = tuple(str(uuid.UUID(int=i, version=4)) for i in range(1, 3))
+
+# (action, status) pairs in which a deployment must still pass signals on
+# to handle_signal().
+_NO_SIGNAL_ACTION_STATES = tuple(itertools.product(
+    (sd.SoftwareDeployment.SUSPEND, sd.SoftwareDeployment.DELETE),
+    sd.SoftwareDeployment.STATUSES))
+
+# Swift temp URL for the signal object: groups are (container, object).
+_TEMP_URL_RE = re.compile(
+    '^http://192.0.2.1/v1/AUTH_test_tenant_id/'
+    '(.*)/(software_deployment_test_stack-deployment_mysql-.*)'
+    '\\?temp_url_sig=.*&temp_url_expires=\\d*$')
+
+# The deploy_* inputs that are appended to the derived config of every
+# deployment created from the templates below.
+_DEPLOY_INPUTS = ({
+    'description': 'ID of the server being deployed to',
+    'name': 'deploy_server_id',
+    'type': 'String',
+    'value': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0'
+}, {
+    'description': 'Name of the current action being deployed',
+    'name': 'deploy_action',
+    'type': 'String',
+    'value': 'CREATE'
+}, {
+    'description': 'ID of the stack this deployment belongs to',
+    'name': 'deploy_stack_id',
+    'type': 'String',
+    'value': '%s/%s' % (_STACK_NAME, _STACK_ID)
+}, {
+    'description': 'Name of this deployment resource in the stack',
+    'name': 'deploy_resource_name',
+    'type': 'String',
+    'value': 'deployment_mysql'
+}, {
+    'description': ('How the server should signal to heat with '
+                    'the deployment output values.'),
+    'name': 'deploy_signal_transport',
+    'type': 'String',
+    'value': 'NO_SIGNAL'
+})
+
+EXPECTED_CREATE_CONFIG_NO_SIGNAL = {
+    'config': 'the config',
+    'group': 'Test::Group',
+    'name': '00_run_me_first',
+    'inputs': [{
+        'default': 'baa',
+        'name': 'foo',
+        'type': 'String',
+        'value': 'bar'
+    }, {
+        'default': 'baz',
+        'name': 'bar',
+        'type': 'String',
+        'value': 'baz'
+    }, {
+        'default': 'default_value',
+        'name': 'trigger_replace',
+        'replace_on_change': True,
+        'type': 'String',
+        'value': 'default_value'
+    }, {
+        'name': 'bink',
+        'type': 'String',
+        'value': 'bonk'
+    }] + list(_DEPLOY_INPUTS),
+    'options': {},
+    'outputs': []
+}
+
+EXPECTED_CREATE_CONFIG_COMPONENT = {
+    'config': {
+        'configs': [
+            {
+                'actions': ['CREATE'],
+                'config': 'the config',
+                'tool': 'a_tool'
+            },
+            {
+                'actions': ['DELETE'],
+                'config': 'the config',
+                'tool': 'a_tool'
+            },
+            {
+                'actions': ['UPDATE'],
+                'config': 'the config',
+                'tool': 'a_tool'
+            },
+            {
+                'actions': ['SUSPEND'],
+                'config': 'the config',
+                'tool': 'a_tool'
+            },
+            {
+                'actions': ['RESUME'],
+                'config': 'the config',
+                'tool': 'a_tool'
+            }
+        ]
+    },
+    'group': 'component',
+    'name': '00_run_me_first',
+    'inputs': [{
+        'default': 'baa',
+        'name': 'foo',
+        'type': 'String',
+        'value': 'bar'
+    }, {
+        'default': 'baz',
+        'name': 'bar',
+        'type': 'String',
+        'value': 'baz'
+    }, {
+        'name': 'bink',
+        'type': 'String',
+        'value': 'bonk'
+    }] + list(_DEPLOY_INPUTS),
+    'options': {},
+    'outputs': []
+}
+
+# The name of an unnamed config is the deployment's physical resource
+# name, so tests add it themselves.
+EXPECTED_CREATE_CONFIG_NO_CONFIG = {
+    'config': '',
+    'group': 'Heat::Ungrouped',
+    'inputs': sorted([{
+        'name': 'bink',
+        'type': 'String',
+        'value': 'bonk'
+    }, {
+        'name': 'foo',
+        'type': 'String',
+        'value': 'bar'
+    }] + list(_DEPLOY_INPUTS), key=lambda k: k['name']),
+    'options': None,
+    'outputs': [],
+}
+
+
+class _FrozenDict(dict):
+    """A dict that raises TypeError on any attempt to modify it.
+
+    Copies are plain, mutable dicts.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('Template data is read-only')
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return dict((k, copy.deepcopy(v, memo)) for k, v in self.items())
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _freeze(data):
+    """Return a read-only copy of a (nested) template dict."""
+    return _FrozenDict((k, _freeze(v) if isinstance(v, dict) else v)
+                       for k, v in data.items())
+
+
+def _clone(data):
+    """Return a mutable deep copy of plain (possibly frozen) test data.
+
+    Round-tripping through pickle is quicker than copy.deepcopy() for
+    nested dicts and lists of literals.
+    """
+    return pickle.loads(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+
+_templates = {}
+
+
+def _get_template(tmpl):
+    """Return a Template for tmpl, parsing each template dict only once.
+
+    The cached Template holds a reference to tmpl, so its id() cannot be
+    reused by another dict while the entry exists.
+    """
+    key = id(tmpl)
+    if key not in _templates:
+        _templates[key] = template.Template(tmpl)
+    return _templates[key]
+
+
+TEMPLATE_BASE = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar'},
             }
         }
     }
+})
 
-    template_with_server = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': 'server',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar'},
-                }
-            },
-            'server': {
-                'Type': 'OS::Nova::Server',
-                'Properties': {
-                    'image': 'fedora-amd64',
-                    'flavor': 'm1.small',
-                    'key_name': 'heat_key'
-                }
+
+TEMPLATE_WITH_SERVER = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': 'server',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar'},
+            }
+        },
+        'server': {
+            'Type': 'OS::Nova::Server',
+            'Properties': {
+                'image': 'fedora-amd64',
+                'flavor': 'm1.small',
+                'key_name': 'heat_key'
             }
         }
     }
-
-    template_no_signal = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar', 'bink': 'bonk'},
-                    'signal_transport': 'NO_SIGNAL',
-                    'name': '00_run_me_first'
-                }
+})
+
+
+TEMPLATE_NO_SIGNAL = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar', 'bink': 'bonk'},
+                'signal_transport': 'NO_SIGNAL',
+                'name': '00_run_me_first'
             }
         }
     }
-
-    template_temp_url_signal = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar', 'bink': 'bonk'},
-                    'signal_transport': 'TEMP_URL_SIGNAL',
-                    'name': '00_run_me_first'
-                }
+})
+
+
+TEMPLATE_TEMP_URL_SIGNAL = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar', 'bink': 'bonk'},
+                'signal_transport': 'TEMP_URL_SIGNAL',
+                'name': '00_run_me_first'
             }
         }
     }
-
-    template_zaqar_signal = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar', 'bink': 'bonk'},
-                    'signal_transport': 'ZAQAR_SIGNAL',
-                    'name': '00_run_me_first'
-                }
+})
+
+
+TEMPLATE_ZAQAR_SIGNAL = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar', 'bink': 'bonk'},
+                'signal_transport': 'ZAQAR_SIGNAL',
+                'name': '00_run_me_first'
             }
         }
     }
+})
+
 
-    template_delete_suspend_resume = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar'},
-                    'actions': ['DELETE', 'SUSPEND', 'RESUME'],
-                }
+TEMPLATE_DELETE_SUSPEND_RESUME = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar'},
+                'actions': ['DELETE', 'SUSPEND', 'RESUME'],
             }
         }
     }
+})
+
 
-    template_update_only = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
-                    'input_values': {'foo': 'bar'},
-                    'actions': ['UPDATE'],
-                }
+TEMPLATE_UPDATE_ONLY = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'config': '48e8ade1-9196-42d5-89a2-f709fde42632',
+                'input_values': {'foo': 'bar'},
+                'actions': ['UPDATE'],
             }
         }
     }
-
-    template_no_config = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {
-                    'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-                    'input_values': {'foo': 'bar', 'bink': 'bonk'},
-                    'signal_transport': 'NO_SIGNAL',
-                }
+})
+
+
+TEMPLATE_NO_CONFIG = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {
+                'server': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+                'input_values': {'foo': 'bar', 'bink': 'bonk'},
+                'signal_transport': 'NO_SIGNAL',
             }
         }
     }
+})
 
-    template_no_server = {
-        'HeatTemplateFormatVersion': '2012-12-12',
-        'Resources': {
-            'deployment_mysql': {
-                'Type': 'OS::Heat::SoftwareDeployment',
-                'Properties': {}
-            }
+
+TEMPLATE_NO_SERVER = _freeze({
+    'HeatTemplateFormatVersion': '2012-12-12',
+    'Resources': {
+        'deployment_mysql': {
+            'Type': 'OS::Heat::SoftwareDeployment',
+            'Properties': {}
         }
     }
+})
+
+
+class SoftwareDeploymentTest(common.HeatTestCase):
+
+    check_complete_methods = ('check_create_complete',
+                              'check_update_complete',
+                              'check_suspend_complete',
+                              'check_resume_complete')
+
+    # RPC client methods that tests give return values or side effects.
+    # reset_mock() does not clear those on child mocks, so they are reset
+    # explicitly whenever the shared client is reused.
+    rpc_methods = ('create_software_config',
+                   'create_software_deployment',
+                   'delete_software_config',
+                   'delete_software_deployment',
+                   'ignore_error_by_name',
+                   'show_software_config',
+                   'show_software_deployment',
+                   'signal_software_deployment',
+                   'update_software_deployment')
+
+    @classmethod
+    def setUpClass(cls):
+        super(SoftwareDeploymentTest, cls).setUpClass()
+        # None of the tests exercise the real user/keypair/signed URL
+        # handling, so stub it out once for the whole class.
+        cls._sd_patcher = mock.patch.multiple(
+            sd.SoftwareDeployment,
+            _create_user=mock.DEFAULT,
+            _create_keypair=mock.DEFAULT,
+            _delete_user=mock.DEFAULT,
+            _delete_ec2_signed_url=mock.DEFAULT,
+            _get_ec2_signed_url=mock.DEFAULT)
+        cls._sd_mocks = cls._sd_patcher.start()
+        cls._sd_mocks['_get_ec2_signed_url'].return_value = (
+            'http://192.0.2.2/signed_url')
+        cls._get_server_patcher = mock.patch.object(
+            nova.NovaClientPlugin, 'get_server',
+            return_value=mock.MagicMock())
+        cls._get_server = cls._get_server_patcher.start()
+        # The Swift and Zaqar signal tests supply their own fake clients.
+        cls._swift_create_patcher = mock.patch.object(
+            swift.SwiftClientPlugin, '_create')
+        cls._swift_create = cls._swift_create_patcher.start()
+        cls._zaqar_create_patcher = mock.patch.object(
+            zaqar.ZaqarClientPlugin, 'create_for_tenant')
+        cls._zaqar_create = cls._zaqar_create_patcher.start()
+        cls._rpc_client = mock.MagicMock()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._zaqar_create_patcher.stop()
+        cls._swift_create_patcher.stop()
+        cls._get_server_patcher.stop()
+        cls._sd_patcher.stop()
+        super(SoftwareDeploymentTest, cls).tearDownClass()
 
     def setUp(self):
         super(SoftwareDeploymentTest, self).setUp()
         self.ctx = utils.dummy_context()
-
-    def _create_stack(self, tmpl, cache_data=None):
-        self.stack = parser.Stack(
-            self.ctx, 'software_deployment_test_stack',
-            template.Template(tmpl),
-            stack_id='42f6f66b-631a-44e7-8d01-e22fb54574a9',
-            stack_user_project_id='65728b74-cfe7-4f17-9c15-11d4f686e591',
-            cache_data=cache_data
-        )
-
-        self.patchobject(nova.NovaClientPlugin, 'get_server',
-                         return_value=mock.MagicMock())
-        self.patchobject(sd.SoftwareDeployment, '_create_user')
-        self.patchobject(sd.SoftwareDeployment, '_create_keypair')
-        self.patchobject(sd.SoftwareDeployment, '_delete_user')
-        self.patchobject(sd.SoftwareDeployment, '_delete_ec2_signed_url')
-        get_ec2_signed_url = self.patchobject(
-            sd.SoftwareDeployment, '_get_ec2_signed_url')
-        get_ec2_signed_url.return_value = 'http://192.0.2.2/signed_url'
-
-        self.deployment = self.stack['deployment_mysql']
-        self.rpc_client = mock.MagicMock()
-        self.deployment._rpc_client = self.rpc_client
+        for sd_mock in self._sd_mocks.values():
+            sd_mock.reset_mock()
+        self._get_server.reset_mock()
+        for client_create in (self._swift_create, self._zaqar_create):
+            client_create.reset_mock(return_value=True, side_effect=True)
+
+    def _use_template(self, tmpl, cache_data=None):
+        # The stack is only built when a test first uses self.stack or
+        # self.deployment; it is bound to the per-test context and database,
+        # so it is never shared with other tests.
+        self._tmpl = tmpl
+        self._cache_data = cache_data
+        self._stack = None
+        self.rpc_client = self._rpc_client
+        self.rpc_client.reset_mock(return_value=True, side_effect=True)
+        for method in self.rpc_methods:
+            getattr(self.rpc_client, method).reset_mock(return_value=True,
+                                                        side_effect=True)
 
         @contextlib.contextmanager
         def exc_filter(*args):
@@ -213,36 +477,61 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
         self.rpc_client.ignore_error_by_name.side_effect = exc_filter
 
+    def _create_bare_deployment(self):
+        # handle_signal() only needs the context, the resource ID and the RPC
+        # client, so tests of it can skip building a stack altogether.
+        self._use_template(TEMPLATE_BASE)
+        deployment = object.__new__(sd.SoftwareDeployment)
+        deployment.context = self.ctx
+        deployment.resource_id = None
+        deployment._rpc_client = self.rpc_client
+        return deployment
+
+    @property
+    def stack(self):
+        if self._stack is None:
+            self._stack = parser.Stack(
+                self.ctx, _STACK_NAME, _get_template(self._tmpl),
+                stack_id=_STACK_ID, stack_user_project_id=_PROJECT_ID,
+                cache_data=self._cache_data
+            )
+            self._stack['deployment_mysql']._rpc_client = self.rpc_client
+        return self._stack
+
+    @property
+    def deployment(self):
+        return self.stack['deployment_mysql']
+
     def test_validate(self):
-        template = dict(self.template_with_server)
+        template = _clone(TEMPLATE_WITH_SERVER)
         props = template['Resources']['server']['Properties']
         props['user_data_format'] = 'SOFTWARE_CONFIG'
-        self._create_stack(self.template_with_server)
+        self._use_template(template)
         mock_sd = self.deployment
         self.assertEqual('CFN_SIGNAL',
                          mock_sd.properties.get('signal_transport'))
         mock_sd.validate()
 
     def test_validate_without_server(self):
-        stack = utils.parse_stack(self.template_no_server)
+        stack = utils.parse_stack(TEMPLATE_NO_SERVER)
         snip = stack.t.resource_definitions(stack)['deployment_mysql']
         deployment = sd.SoftwareDeployment('deployment_mysql', snip, stack)
         err = self.assertRaises(exc.StackValidationFailed, deployment.validate)
         self.assertEqual("Property error: "
                          "Resources.deployment_mysql.Properties: "
-                         "Property server not assigned", six.text_type(err))
+                         "Property server not assigned", str(err))
 
     def test_validate_failed(self):
-        template = dict(self.template_with_server)
+        template = _clone(TEMPLATE_WITH_SERVER)
         props = template['Resources']['server']['Properties']
         props['user_data_format'] = 'RAW'
-        self._create_stack(template)
+        self._use_template(template)
         mock_sd = self.deployment
         err = self.assertRaises(exc.StackValidationFailed, mock_sd.validate)
         self.assertEqual("Resource server's property "
                          "user_data_format should be set to "
                          "SOFTWARE_CONFIG since there are "
-                         "software deployments on it.", six.text_type(err))
+                         "software deployments on it.", str(err))
 
     def mock_software_config(self):
         config = {
@@ -267,7 +556,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             'outputs': [],
         }
 
-        derived_config = copy.deepcopy(config)
+        derived_config = _clone(config)
         values = {'foo': 'bar'}
         inputs = derived_config['inputs']
         for i in inputs:
@@ -356,84 +645,37 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.rpc_client.create_software_deployment.return_value = mock_sd
         return mock_sd
 
-    def test_handle_create(self):
-        self._create_stack(self.template_no_signal)
-
-        self.mock_software_config()
-        derived_sc = self.mock_derived_software_config()
-        self.mock_deployment()
-
-        self.deployment.handle_create()
-
-        self.assertEqual({
-            'config': 'the config',
-            'group': 'Test::Group',
-            'name': '00_run_me_first',
-            'inputs': [{
-                'default': 'baa',
-                'name': 'foo',
-                'type': 'String',
-                'value': 'bar'
-            }, {
-                'default': 'baz',
-                'name': 'bar',
-                'type': 'String',
-                'value': 'baz'
-            }, {
-                'default': 'default_value',
-                'name': 'trigger_replace',
-                'replace_on_change': True,
-                'type': 'String',
-                'value': 'default_value'
-            }, {
-                'name': 'bink',
-                'type': 'String',
-                'value': 'bonk'
-            }, {
-                'description': 'ID of the server being deployed to',
-                'name': 'deploy_server_id',
-                'type': 'String',
-                'value': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0'
-            }, {
-                'description': 'Name of the current action being deployed',
-                'name': 'deploy_action',
-                'type': 'String',
-                'value': 'CREATE'
-            }, {
-                'description': 'ID of the stack this deployment belongs to',
-                'name': 'deploy_stack_id',
-                'type': 'String',
-                'value': ('software_deployment_test_stack'
-                          '/42f6f66b-631a-44e7-8d01-e22fb54574a9')
-            }, {
-                'description': 'Name of this deployment resource in the stack',
-                'name': 'deploy_resource_name',
-                'type': 'String',
-                'value': 'deployment_mysql'
-            }, {
-                'description': ('How the server should signal to heat with '
-                                'the deployment output values.'),
-                'name': 'deploy_signal_transport',
-                'type': 'String',
-                'value': 'NO_SIGNAL'
-            }],
-            'options': {},
-            'outputs': []
-        }, self.rpc_client.create_software_config.call_args[1])
-
+    def _assert_create_produced(self, expected_config, derived_sc):
+        # Check the derived config and the deployment that handle_create()
+        # asked the engine to create when not waiting for a signal.
+        self.assertEqual(
+            expected_config,
+            self.rpc_client.create_software_config.call_args[1])
         self.assertEqual(
             {'action': 'CREATE',
              'config_id': derived_sc['id'],
              'deployment_id': self.deployment.resource_id,
-             'server_id': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
              'input_values': {'bink': 'bonk', 'foo': 'bar'},
-             'stack_user_project_id': '65728b74-cfe7-4f17-9c15-11d4f686e591',
+             'server_id': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
+             'stack_user_project_id': _PROJECT_ID,
              'status': 'COMPLETE',
              'status_reason': 'Not waiting for outputs signal'},
             self.rpc_client.create_software_deployment.call_args[1])
 
+    def test_handle_create(self):
+        self._use_template(TEMPLATE_NO_SIGNAL)
+
+        self.mock_software_config()
+        derived_sc = self.mock_derived_software_config()
+        self.mock_deployment()
+
+        self.deployment.handle_create()
+
+        self._assert_create_produced(EXPECTED_CREATE_CONFIG_NO_SIGNAL,
+                                     derived_sc)
+
     def test_handle_create_without_config(self):
-        self._create_stack(self.template_no_config)
+        self._use_template(TEMPLATE_NO_CONFIG)
         self.mock_deployment()
         derived_sc = self.mock_derived_software_config()
         self.deployment.handle_create()
@@ -441,63 +683,13 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         call_arg = self.rpc_client.create_software_config.call_args[1]
         call_arg['inputs'] = sorted(
             call_arg['inputs'], key=lambda k: k['name'])
-        self.assertEqual({
-            'config': '',
-            'group': 'Heat::Ungrouped',
-            'name': self.deployment.physical_resource_name(),
-            'inputs': [{
-                'name': 'bink',
-                'type': 'String',
-                'value': 'bonk'
-            }, {
-                'description': 'Name of the current action being deployed',
-                'name': 'deploy_action',
-                'type': 'String',
-                'value': 'CREATE'
-            }, {
-                'description': 'Name of this deployment resource in the stack',
-                'name': 'deploy_resource_name',
-                'type': 'String',
-                'value': 'deployment_mysql'
-            }, {
-                'description': 'ID of the server being deployed to',
-                'name': 'deploy_server_id',
-                'type': 'String',
-                'value': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0'
-            }, {
-                'description': ('How the server should signal to heat with '
-                                'the deployment output values.'),
-                'name': 'deploy_signal_transport',
-                'type': 'String',
-                'value': 'NO_SIGNAL'
-            }, {
-                'description': 'ID of the stack this deployment belongs to',
-                'name': 'deploy_stack_id',
-                'type': 'String',
-                'value': ('software_deployment_test_stack'
-                          '/42f6f66b-631a-44e7-8d01-e22fb54574a9')
-            }, {
-                'name': 'foo',
-                'type': 'String',
-                'value': 'bar'
-            }],
-            'options': None,
-            'outputs': [],
-        }, call_arg)
-
-        self.assertEqual(
-            {'action': 'CREATE',
-             'config_id': derived_sc['id'],
-             'deployment_id': self.deployment.resource_id,
-             'input_values': {'bink': 'bonk', 'foo': 'bar'},
-             'server_id': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-             'stack_user_project_id': '65728b74-cfe7-4f17-9c15-11d4f686e591',
-             'status': 'COMPLETE',
-             'status_reason': 'Not waiting for outputs signal'},
-            self.rpc_client.create_software_deployment.call_args[1])
+        self._assert_create_produced(
+            dict(EXPECTED_CREATE_CONFIG_NO_CONFIG,
+                 name=self.deployment.physical_resource_name()),
+            derived_sc)
 
     def test_handle_create_for_component(self):
-        self._create_stack(self.template_no_signal)
+        self._use_template(TEMPLATE_NO_SIGNAL)
 
         self.mock_software_component()
         derived_sc = self.mock_derived_software_config()
@@ -505,97 +697,11 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
         self.deployment.handle_create()
 
-        self.assertEqual({
-            'config': {
-                'configs': [
-                    {
-                        'actions': ['CREATE'],
-                        'config': 'the config',
-                        'tool': 'a_tool'
-                    },
-                    {
-                        'actions': ['DELETE'],
-                        'config': 'the config',
-                        'tool': 'a_tool'
-                    },
-                    {
-                        'actions': ['UPDATE'],
-                        'config': 'the config',
-                        'tool': 'a_tool'
-                    },
-                    {
-                        'actions': ['SUSPEND'],
-                        'config': 'the config',
-                        'tool': 'a_tool'
-                    },
-                    {
-                        'actions': ['RESUME'],
-                        'config': 'the config',
-                        'tool': 'a_tool'
-                    }
-                ]
-            },
-            'group': 'component',
-            'name': '00_run_me_first',
-            'inputs': [{
-                'default': 'baa',
-                'name': 'foo',
-                'type': 'String',
-                'value': 'bar'
-            }, {
-                'default': 'baz',
-                'name': 'bar',
-                'type': 'String',
-                'value': 'baz'
-            }, {
-                'name': 'bink',
-                'type': 'String',
-                'value': 'bonk'
-            }, {
-                'description': 'ID of the server being deployed to',
-                'name': 'deploy_server_id',
-                'type': 'String',
-                'value': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0'
-            }, {
-                'description': 'Name of the current action being deployed',
-                'name': 'deploy_action',
-                'type': 'String',
-                'value': 'CREATE'
-            }, {
-                'description': 'ID of the stack this deployment belongs to',
-                'name': 'deploy_stack_id',
-                'type': 'String',
-                'value': ('software_deployment_test_stack'
-                          '/42f6f66b-631a-44e7-8d01-e22fb54574a9')
-            }, {
-                'description': 'Name of this deployment resource in the stack',
-                'name': 'deploy_resource_name',
-                'type': 'String',
-                'value': 'deployment_mysql'
-            }, {
-                'description': ('How the server should signal to heat with '
-                                'the deployment output values.'),
-                'name': 'deploy_signal_transport',
-                'type': 'String',
-                'value': 'NO_SIGNAL'
-            }],
-            'options': {},
-            'outputs': []
-        }, self.rpc_client.create_software_config.call_args[1])
-
-        self.assertEqual(
-            {'action': 'CREATE',
-             'config_id': derived_sc['id'],
-             'deployment_id': self.deployment.resource_id,
-             'input_values': {'bink': 'bonk', 'foo': 'bar'},
-             'server_id': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-             'stack_user_project_id': '65728b74-cfe7-4f17-9c15-11d4f686e591',
-             'status': 'COMPLETE',
-             'status_reason': 'Not waiting for outputs signal'},
-            self.rpc_client.create_software_deployment.call_args[1])
+        self._assert_create_produced(EXPECTED_CREATE_CONFIG_COMPONENT,
+                                     derived_sc)
 
     def test_handle_create_do_not_wait(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_software_config()
         derived_sc = self.mock_derived_software_config()
@@ -608,72 +714,30 @@ class SoftwareDeploymentTest(common.HeatTestCase):
              'deployment_id': self.deployment.resource_id,
              'input_values': {'foo': 'bar'},
              'server_id': '9f1f0e00-05d2-4ca5-8602-95021f19c9d0',
-             'stack_user_project_id': '65728b74-cfe7-4f17-9c15-11d4f686e591',
+             'stack_user_project_id': _PROJECT_ID,
              'status': 'IN_PROGRESS',
              'status_reason': 'Deploy data available'},
             self.rpc_client.create_software_deployment.call_args[1])
 
-    def test_check_create_complete(self):
-        self._create_stack(self.template)
-        mock_sd = self.mock_deployment()
-        self.rpc_client.show_software_deployment.return_value = mock_sd
-
-        mock_sd['status'] = self.deployment.COMPLETE
-        self.assertTrue(self.deployment.check_create_complete(mock_sd))
-        mock_sd['status'] = self.deployment.IN_PROGRESS
-        self.assertFalse(self.deployment.check_create_complete(mock_sd))
-
-    def test_check_create_complete_none(self):
-        self._create_stack(self.template)
-        self.assertTrue(self.deployment.check_create_complete(sd=None))
-
-    def test_check_update_complete(self):
-        self._create_stack(self.template)
+    def test_check_action_complete(self):
+        self._use_template(TEMPLATE_BASE)
         mock_sd = self.mock_deployment()
         self.rpc_client.show_software_deployment.return_value = mock_sd
 
-        mock_sd['status'] = self.deployment.COMPLETE
-        self.assertTrue(self.deployment.check_update_complete(mock_sd))
-
-        mock_sd['status'] = self.deployment.IN_PROGRESS
-        self.assertFalse(self.deployment.check_update_complete(mock_sd))
-
-    def test_check_update_complete_none(self):
-        self._create_stack(self.template)
-        self.assertTrue(self.deployment.check_update_complete(sd=None))
-
-    def test_check_suspend_complete(self):
-        self._create_stack(self.template)
-        mock_sd = self.mock_deployment()
-        self.rpc_client.show_software_deployment.return_value = mock_sd
-
-        mock_sd['status'] = self.deployment.COMPLETE
-        self.assertTrue(self.deployment.check_suspend_complete(mock_sd))
-
-        mock_sd['status'] = self.deployment.IN_PROGRESS
-        self.assertFalse(self.deployment.check_suspend_complete(mock_sd))
-
-    def test_check_suspend_complete_none(self):
-        self._create_stack(self.template)
-        self.assertTrue(self.deployment.check_suspend_complete(sd=None))
-
-    def test_check_resume_complete(self):
-        self._create_stack(self.template)
-        mock_sd = self.mock_deployment()
-        self.rpc_client.show_software_deployment.return_value = mock_sd
-
-        mock_sd['status'] = self.deployment.COMPLETE
-        self.assertTrue(self.deployment.check_resume_complete(mock_sd))
+        for method in self.check_complete_methods:
+            check_complete = getattr(self.deployment, method)
+            mock_sd['status'] = self.deployment.COMPLETE
+            self.assertTrue(check_complete(mock_sd))
+            mock_sd['status'] = self.deployment.IN_PROGRESS
+            self.assertFalse(check_complete(mock_sd))
 
-        mock_sd['status'] = self.deployment.IN_PROGRESS
-        self.assertFalse(self.deployment.check_resume_complete(mock_sd))
-
-    def test_check_resume_complete_none(self):
-        self._create_stack(self.template)
-        self.assertTrue(self.deployment.check_resume_complete(sd=None))
+    def test_check_action_complete_none(self):
+        self._use_template(TEMPLATE_BASE)
+        for method in self.check_complete_methods:
+            self.assertTrue(getattr(self.deployment, method)(sd=None))
 
     def test_check_create_complete_error(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         mock_sd = {
             'status': self.deployment.FAILED,
             'status_reason': 'something wrong'
@@ -682,10 +746,10 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         err = self.assertRaises(
             exc.Error, self.deployment.check_create_complete, mock_sd)
         self.assertEqual(
-            'Deployment to server failed: something wrong', six.text_type(err))
+            'Deployment to server failed: something wrong', str(err))
 
     def test_handle_create_cancel(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         mock_sd = self.mock_deployment()
         self.rpc_client.show_software_deployment.return_value = mock_sd
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
@@ -708,7 +772,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
                          self.rpc_client.update_software_deployment.call_count)
 
     def test_handle_delete(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         mock_sd = self.mock_deployment()
         self.rpc_client.show_software_deployment.return_value = mock_sd
 
@@ -720,13 +784,13 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.rpc_client.delete_software_deployment.call_args[0])
 
     def test_handle_delete_resource_id_is_None(self):
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
         self.mock_software_config()
         mock_sd = self.mock_deployment()
         self.assertEqual(mock_sd, self.deployment.handle_delete())
 
     def test_delete_complete(self):
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
 
         self.mock_software_config()
         derived_sc = self.mock_derived_software_config()
@@ -755,7 +819,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
     def test_delete_complete_missing_server(self):
         """Tests deleting a deployment when the server disappears"""
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
 
         self.mock_software_config()
         mock_sd = self.mock_deployment()
@@ -777,7 +841,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         mock_get_server.assert_called_once_with(mock_sd['server_id'])
 
     def test_handle_delete_notfound(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         deployment_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         self.deployment.resource_id = deployment_id
 
@@ -797,20 +861,20 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.rpc_client.delete_software_config.call_args[0])
 
     def test_handle_delete_none(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         deployment_id = None
         self.deployment.resource_id = deployment_id
         self.assertIsNone(self.deployment.handle_delete())
 
     def test_check_delete_complete_none(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         self.assertTrue(self.deployment.check_delete_complete())
 
     def test_check_delete_complete_delete_sd(self):
         # handle_delete will return None if NO_SIGNAL,
         # in this case also need to call the _delete_resource(),
         # otherwise the sd data will residue in db
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         mock_sd = self.mock_deployment()
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         self.rpc_client.show_software_deployment.return_value = mock_sd
@@ -820,7 +884,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.rpc_client.delete_software_deployment.call_args[0])
 
     def test_handle_update(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_derived_software_config()
         mock_sd = self.mock_deployment()
@@ -833,8 +897,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             'config': config_id,
             'name': 'new_name'
         }
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
 
         self.deployment.handle_update(
@@ -861,7 +924,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.rpc_client.update_software_deployment.call_args[1])
 
     def test_handle_update_no_replace_on_change(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_software_config()
         self.mock_derived_software_config()
@@ -873,8 +936,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         prop_diff = {
             'input_values': {'trigger_replace': 'default_value'},
         }
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
 
         self.deployment.handle_update(snippet, None, prop_diff)
@@ -909,7 +971,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.rpc_client.create_software_config.call_args[1]['inputs'][:3])
 
     def test_handle_update_replace_on_change(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_software_config()
         self.mock_derived_software_config()
@@ -921,8 +983,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         prop_diff = {
             'input_values': {'trigger_replace': 'new_value'},
         }
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
 
         self.assertRaises(resource.UpdateReplace,
@@ -930,20 +991,19 @@ class SoftwareDeploymentTest(common.HeatTestCase):
                           snippet, None, prop_diff)
 
     def test_handle_update_with_update_only(self):
-        self._create_stack(self.template_update_only)
+        self._use_template(TEMPLATE_UPDATE_ONLY)
         rsrc = self.stack['deployment_mysql']
         prop_diff = {
             'input_values': {'foo': 'different'}
         }
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
         self.deployment.handle_update(
             json_snippet=snippet, tmpl_diff=None, prop_diff=prop_diff)
         self.rpc_client.show_software_deployment.assert_not_called()
 
     def test_handle_suspend_resume(self):
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
 
         self.mock_software_config()
         derived_sc = self.mock_derived_software_config()
@@ -989,24 +1049,22 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertTrue(self.deployment.check_resume_complete(mock_sd))
 
     def test_handle_signal_ok_zero(self):
-        self._create_stack(self.template)
-        self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
+        deployment = self._create_bare_deployment()
+        deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = 'deployment succeeded'
         details = {
             'foo': 'bar',
             'deploy_status_code': 0
         }
-        ret = self.deployment.handle_signal(details)
+        ret = deployment.handle_signal(details)
         self.assertEqual('deployment succeeded', ret)
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertEqual('c8a19429-7fde-47ea-a42f-40045488226c', ca[1])
-        self.assertEqual({'foo': 'bar', 'deploy_status_code': 0}, ca[2])
-        self.assertIsNotNone(ca[3])
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, 'c8a19429-7fde-47ea-a42f-40045488226c',
+            {'foo': 'bar', 'deploy_status_code': 0}, mock.ANY)
 
     def test_no_signal_action(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = 'deployment succeeded'
@@ -1014,59 +1072,51 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             'foo': 'bar',
             'deploy_status_code': 0
         }
-        actions = [self.deployment.SUSPEND, self.deployment.DELETE]
         ev = self.patchobject(self.deployment, 'handle_signal')
-        for action in actions:
-            for status in self.deployment.STATUSES:
-                self.deployment.state_set(action, status)
-                self.deployment.signal(details)
-                ev.assert_called_with(details)
+        for action, status in _NO_SIGNAL_ACTION_STATES:
+            self.deployment.state_set(action, status)
+            self.deployment.signal(details)
+            ev.assert_called_with(details)
 
     def test_handle_signal_ok_str_zero(self):
-        self._create_stack(self.template)
-        self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
+        deployment = self._create_bare_deployment()
+        deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = 'deployment succeeded'
         details = {
             'foo': 'bar',
             'deploy_status_code': '0'
         }
-        ret = self.deployment.handle_signal(details)
+        ret = deployment.handle_signal(details)
         self.assertEqual('deployment succeeded', ret)
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertEqual('c8a19429-7fde-47ea-a42f-40045488226c', ca[1])
-        self.assertEqual({'foo': 'bar', 'deploy_status_code': '0'}, ca[2])
-        self.assertIsNotNone(ca[3])
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, 'c8a19429-7fde-47ea-a42f-40045488226c',
+            {'foo': 'bar', 'deploy_status_code': '0'}, mock.ANY)
 
     def test_handle_signal_failed(self):
-        self._create_stack(self.template)
-        self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
+        deployment = self._create_bare_deployment()
+        deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = 'deployment failed'
 
         details = {'failed': 'no enough memory found.'}
-        ret = self.deployment.handle_signal(details)
+        ret = deployment.handle_signal(details)
         self.assertEqual('deployment failed', ret)
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertEqual('c8a19429-7fde-47ea-a42f-40045488226c', ca[1])
-        self.assertEqual(details, ca[2])
-        self.assertIsNotNone(ca[3])
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, 'c8a19429-7fde-47ea-a42f-40045488226c', details,
+            mock.ANY)
 
         # Test bug 1332355, where details contains a translatable message
         details = {'failed': _('need more memory.')}
-        ret = self.deployment.handle_signal(details)
+        ret = deployment.handle_signal(details)
         self.assertEqual('deployment failed', ret)
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertEqual('c8a19429-7fde-47ea-a42f-40045488226c', ca[1])
-        self.assertEqual(details, ca[2])
-        self.assertIsNotNone(ca[3])
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, 'c8a19429-7fde-47ea-a42f-40045488226c', details,
+            mock.ANY)
 
     def test_handle_status_code_failed(self):
-        self._create_stack(self.template)
-        self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
+        deployment = self._create_bare_deployment()
+        deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = 'deployment failed'
 
@@ -1075,27 +1125,22 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             'deploy_stderr': 'Then it broke',
             'deploy_status_code': -1
         }
-        self.deployment.handle_signal(details)
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertEqual('c8a19429-7fde-47ea-a42f-40045488226c', ca[1])
-        self.assertEqual(details, ca[2])
-        self.assertIsNotNone(ca[3])
+        deployment.handle_signal(details)
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, 'c8a19429-7fde-47ea-a42f-40045488226c', details,
+            mock.ANY)
 
     def test_handle_signal_not_waiting(self):
-        self._create_stack(self.template)
+        deployment = self._create_bare_deployment()
         rpcc = self.rpc_client
         rpcc.signal_software_deployment.return_value = None
         details = None
-        self.assertIsNone(self.deployment.handle_signal(details))
-        ca = rpcc.signal_software_deployment.call_args[0]
-        self.assertEqual(self.ctx, ca[0])
-        self.assertIsNone(ca[1])
-        self.assertIsNone(ca[2])
-        self.assertIsNotNone(ca[3])
+        self.assertIsNone(deployment.handle_signal(details))
+        rpcc.signal_software_deployment.assert_called_with(
+            self.ctx, None, None, mock.ANY)
 
     def test_fn_get_att(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         mock_sd = {
             'outputs': [
@@ -1126,12 +1171,12 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             'status': 'COMPLETE',
             'attrs': {'foo': 'bar'}
         })}
-        self._create_stack(self.template, cache_data=cache_data)
+        self._use_template(TEMPLATE_BASE, cache_data=cache_data)
         self.assertEqual('bar',
                          self.stack.defn[self.deployment.name].FnGetAtt('foo'))
 
     def test_fn_get_att_error(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
 
         mock_sd = {
@@ -1145,10 +1190,10 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             self.deployment.FnGetAtt, 'foo2')
         self.assertEqual(
             'The Referenced Attribute (deployment_mysql foo2) is incorrect.',
-            six.text_type(err))
+            str(err))
 
     def test_handle_action(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_software_config()
         mock_sd = self.mock_deployment()
@@ -1158,8 +1203,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         config_id = '0ff2e903-78d7-4cca-829e-233af3dae705'
         prop_diff = {'config': config_id}
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
 
         # by default (no 'actions' property) SoftwareDeployment must only
@@ -1173,7 +1217,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertIsNone(self.deployment.handle_delete())
 
     def test_handle_action_for_component(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         self.mock_software_component()
         mock_sd = self.mock_deployment()
@@ -1183,8 +1227,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.deployment.resource_id = 'c8a19429-7fde-47ea-a42f-40045488226c'
         config_id = '0ff2e903-78d7-4cca-829e-233af3dae705'
         prop_diff = {'config': config_id}
-        props = copy.copy(rsrc.properties.data)
-        props.update(prop_diff)
+        props = dict(rsrc.properties.data, **prop_diff)
         snippet = rsrc_defn.ResourceDefinition(rsrc.name, rsrc.type(), props)
 
         # for a SoftwareComponent, SoftwareDeployment must always trigger
@@ -1196,7 +1239,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertIsNotNone(self.deployment.handle_delete())
 
     def test_handle_unused_action_for_component(self):
-        self._create_stack(self.template)
+        self._use_template(TEMPLATE_BASE)
 
         config = {
             'id': '48e8ade1-9196-42d5-89a2-f709fde42632',
@@ -1236,18 +1279,18 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertIsNone(self.deployment.handle_delete())
 
     def test_get_temp_url(self):
-        dep_data = {}
+        # Unset resource data reads the same as missing data to the resource.
+        dep_data = {'swift_signal_object_name': None,
+                    'swift_signal_url': None}
 
-        sc = mock.MagicMock()
-        scc = self.patch(
-            'heat.engine.clients.os.swift.SwiftClientPlugin._create')
-        scc.return_value = sc
+        sc = mock.Mock(spec=swiftclient.Connection)
+        self._swift_create.return_value = sc
         sc.head_account.return_value = {
             'x-account-meta-temp-url-key': 'secrit'
         }
         sc.url = 'http://192.0.2.1/v1/AUTH_test_tenant_id'
 
-        self._create_stack(self.template_temp_url_signal)
+        self._use_template(TEMPLATE_TEMP_URL_SIGNAL)
 
         def data_set(key, value, redact=False):
             dep_data[key] = value
@@ -1257,17 +1300,17 @@ class SoftwareDeploymentTest(common.HeatTestCase):
             return_value=dep_data)
 
         self.deployment.id = 23
-        self.deployment.uuid = str(uuid.uuid4())
+        self.deployment.uuid = _UUIDS[0]
         self.deployment.action = self.deployment.CREATE
+        # The name only depends on the stack, resource name and UUID, which
+        # are all fixed from here on.
         object_name = self.deployment.physical_resource_name()
+        self.deployment.physical_resource_name = mock.Mock(
+            return_value=object_name)
 
         temp_url = self.deployment._get_swift_signal_url()
-        temp_url_pattern = re.compile(
-            '^http://192.0.2.1/v1/AUTH_test_tenant_id/'
-            '(.*)/(software_deployment_test_stack-deployment_mysql-.*)'
-            '\\?temp_url_sig=.*&temp_url_expires=\\d*$')
-        self.assertRegex(temp_url, temp_url_pattern)
-        m = temp_url_pattern.search(temp_url)
+        self.assertRegex(temp_url, _TEMP_URL_RE)
+        m = _TEMP_URL_RE.search(temp_url)
         container = m.group(1)
         self.assertEqual(object_name, m.group(2))
         self.assertEqual(dep_data['swift_signal_object_name'], object_name)
@@ -1280,27 +1323,25 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         sc.put_object.assert_called_once_with(container, object_name, '')
 
     def test_delete_temp_url(self):
-        object_name = str(uuid.uuid4())
+        object_name = _UUIDS[1]
         dep_data = {
             'swift_signal_object_name': object_name
         }
-        self._create_stack(self.template_temp_url_signal)
+        self._use_template(TEMPLATE_TEMP_URL_SIGNAL)
 
         self.deployment.data_delete = mock.MagicMock()
         self.deployment.data = mock.Mock(
             return_value=dep_data)
 
-        sc = mock.MagicMock()
+        sc = mock.Mock(spec=swiftclient.Connection)
         sc.get_container.return_value = ({}, [{'name': object_name}])
         sc.head_container.return_value = {
             'x-container-object-count': 0
         }
-        scc = self.patch(
-            'heat.engine.clients.os.swift.SwiftClientPlugin._create')
-        scc.return_value = sc
+        self._swift_create.return_value = sc
 
         self.deployment.id = 23
-        self.deployment.uuid = str(uuid.uuid4())
+        self.deployment.uuid = _UUIDS[0]
         container = self.stack.id
         self.deployment._delete_swift_signal_url()
         sc.delete_object.assert_called_once_with(container, object_name)
@@ -1327,7 +1368,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
     def test_handle_action_temp_url(self):
 
-        self._create_stack(self.template_temp_url_signal)
+        self._use_template(TEMPLATE_TEMP_URL_SIGNAL)
         dep_data = {
             'swift_signal_url': (
                 'http://192.0.2.1/v1/AUTH_a/b/c'
@@ -1338,18 +1379,20 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
         self.mock_software_config()
 
-        for action in ('DELETE', 'SUSPEND', 'RESUME'):
-            self.assertIsNone(self.deployment._handle_action(action))
-        for action in ('CREATE', 'UPDATE'):
-            self.assertIsNotNone(self.deployment._handle_action(action))
+        handle_action = self.deployment._handle_action
+        self.assertEqual(
+            [None] * 3,
+            [handle_action(a) for a in ('DELETE', 'SUSPEND', 'RESUME')])
+        self.assertNotIn(
+            None, [handle_action(a) for a in ('CREATE', 'UPDATE')])
 
     def test_get_zaqar_queue(self):
-        dep_data = {}
+        # Unset resource data reads the same as missing data to the resource.
+        dep_data = {'zaqar_signal_queue_id': None,
+                    'zaqar_queue_signed_url_data': None}
 
-        zc = mock.MagicMock()
-        zcc = self.patch(
-            'heat.engine.clients.os.zaqar.ZaqarClientPlugin.create_for_tenant')
-        zcc.return_value = zc
+        zc = mock.Mock(spec=zaqarclient.Client)
+        self._zaqar_create.return_value = zc
 
         mock_queue = mock.MagicMock()
         zc.queue.return_value = mock_queue
@@ -1357,7 +1400,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         signed_data = {"signature": "hi", "expires": "later"}
         mock_queue.signed_url.return_value = signed_data
 
-        self._create_stack(self.template_zaqar_signal)
+        self._use_template(TEMPLATE_ZAQAR_SIGNAL)
 
         def data_set(key, value, redact=False):
             dep_data[key] = value
@@ -1366,7 +1409,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.deployment.data = mock.Mock(return_value=dep_data)
 
         self.deployment.id = 23
-        self.deployment.uuid = str(uuid.uuid4())
+        self.deployment.uuid = _UUIDS[0]
         self.deployment.action = self.deployment.CREATE
 
         queue_id = self.deployment._get_zaqar_signal_queue_id()
@@ -1377,23 +1420,22 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertEqual(queue_id,
                          self.deployment._get_zaqar_signal_queue_id())
 
-    @mock.patch.object(zaqar.ZaqarClientPlugin, 'create_for_tenant')
-    def test_delete_zaqar_queue(self, zcc):
-        queue_id = str(uuid.uuid4())
+    def test_delete_zaqar_queue(self):
+        queue_id = _UUIDS[1]
         dep_data = {
             'password': 'password',
             'zaqar_signal_queue_id': queue_id
         }
-        self._create_stack(self.template_zaqar_signal)
+        self._use_template(TEMPLATE_ZAQAR_SIGNAL)
 
         self.deployment.data_delete = mock.MagicMock()
         self.deployment.data = mock.Mock(return_value=dep_data)
 
-        zc = mock.MagicMock()
-        zcc.return_value = zc
+        zc = mock.Mock(spec=zaqarclient.Client)
+        self._zaqar_create.return_value = zc
 
         self.deployment.id = 23
-        self.deployment.uuid = str(uuid.uuid4())
+        self.deployment.uuid = _UUIDS[0]
         self.deployment._delete_zaqar_signal_queue()
         zc.queue.assert_called_once_with(queue_id)
         self.assertTrue(zc.queue(self.deployment.uuid).delete.called)
@@ -1416,7 +1458,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
     def test_server_exists(self):
         # Setup
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
         mock_sd = {'server_id': 'b509edfb-1448-4b57-8cb1-2e31acccbb8a'}
 
         # For a success case, this doesn't raise an exception
@@ -1428,7 +1470,7 @@ class SoftwareDeploymentTest(common.HeatTestCase):
 
     def test_server_exists_no_server(self):
         # Setup
-        self._create_stack(self.template_delete_suspend_resume)
+        self._use_template(TEMPLATE_DELETE_SUSPEND_RESUME)
         mock_sd = {'server_id': 'b509edfb-1448-4b57-8cb1-2e31acccbb8a'}
 
         # For a success case, this doesn't raise an exception
@@ -1440,31 +1482,64 @@ class SoftwareDeploymentTest(common.HeatTestCase):
         self.assertFalse(result)
 
 
-class SoftwareDeploymentGroupTest(common.HeatTestCase):
-
-    template = {
-        'heat_template_version': '2013-05-23',
-        'resources': {
-            'deploy_mysql': {
-                'type': 'OS::Heat::SoftwareDeploymentGroup',
-                'properties': {
-                    'config': 'config_uuid',
-                    'servers': {'server1': 'uuid1', 'server2': 'uuid2'},
-                    'input_values': {'foo': 'bar'},
-                    'name': '10_config'
-                }
+TEMPLATE_GROUP = _freeze({
+    'heat_template_version': '2013-05-23',
+    'resources': {
+        'deploy_mysql': {
+            'type': 'OS::Heat::SoftwareDeploymentGroup',
+            'properties': {
+                'config': 'config_uuid',
+                'servers': {'server1': 'uuid1', 'server2': 'uuid2'},
+                'input_values': {'foo': 'bar'},
+                'name': '10_config'
             }
         }
     }
+})
+
+# The nested stack that TEMPLATE_GROUP is expected to assemble.
+EXPECTED_GROUP_NESTED_TEMPLATE = _freeze({
+    "heat_template_version": "2015-04-30",
+    "resources": {
+        "server1": {
+            'type': 'OS::Heat::SoftwareDeployment',
+            'properties': {
+                'server': 'uuid1',
+                'actions': ['CREATE', 'UPDATE'],
+                'config': 'config_uuid',
+                'input_values': {'foo': 'bar'},
+                'name': '10_config',
+                'signal_transport': 'CFN_SIGNAL'
+            }
+        },
+        "server2": {
+            'type': 'OS::Heat::SoftwareDeployment',
+            'properties': {
+                'server': 'uuid2',
+                'actions': ['CREATE', 'UPDATE'],
+                'config': 'config_uuid',
+                'input_values': {'foo': 'bar'},
+                'name': '10_config',
+                'signal_transport': 'CFN_SIGNAL'
+            }
+        }
+    }
+})
 
-    def setUp(self):
-        common.HeatTestCase.setUp(self)
-        self.rpc_client = mock.MagicMock()
+
+class SoftwareDeploymentGroupTest(common.HeatTestCase):
+
+    def _create_group(self, name='test'):
+        # None of these tests need the stack to be stored, so build it
+        # straight from the cached template. Resources only hold a weak
+        # reference to their stack, so keep it alive on the test.
+        self.stack = parser.Stack(utils.dummy_context(), utils.random_name(),
+                                  _get_template(TEMPLATE_GROUP))
+        snip = self.stack.t.resource_definitions(self.stack)['deploy_mysql']
+        return sd.SoftwareDeploymentGroup(name, snip, self.stack)
 
     def test_build_resource_definition(self):
-        stack = utils.parse_stack(self.template)
-        snip = stack.t.resource_definitions(stack)['deploy_mysql']
-        resg = sd.SoftwareDeploymentGroup('test', snip, stack)
+        resg = self._create_group()
 
         expect = rsrc_defn.ResourceDefinition(
             None,
@@ -1484,18 +1559,13 @@ class SoftwareDeploymentGroupTest(common.HeatTestCase):
             expect, resg.build_resource_definition('server1', rdef))
 
     def test_resource_names(self):
-        stack = utils.parse_stack(self.template)
-        snip = stack.t.resource_definitions(stack)['deploy_mysql']
-        resg = sd.SoftwareDeploymentGroup('test', snip, stack)
-        self.assertEqual(
-            set(('server1', 'server2')),
-            set(resg._resource_names())
-        )
+        resg = self._create_group()
+        self.assertEqual(('server1', 'server2'),
+                         tuple(sorted(resg._resource_names())))
 
         resg.properties = {'servers': {'s1': 'u1', 's2': 'u2', 's3': 'u3'}}
-        self.assertEqual(
-            set(('s1', 's2', 's3')),
-            set(resg._resource_names()))
+        self.assertEqual(('s1', 's2', 's3'),
+                         tuple(sorted(resg._resource_names())))
 
     def test_assemble_nested(self):
         """Tests nested stack implements group creation based on properties.
@@ -1503,44 +1573,12 @@ class SoftwareDeploymentGroupTest(common.HeatTestCase):
         Tests that the nested stack that implements the group is created
         appropriately based on properties.
         """
-        stack = utils.parse_stack(self.template)
-        snip = stack.t.resource_definitions(stack)['deploy_mysql']
-        resg = sd.SoftwareDeploymentGroup('test', snip, stack)
-        templ = {
-            "heat_template_version": "2015-04-30",
-            "resources": {
-                "server1": {
-                    'type': 'OS::Heat::SoftwareDeployment',
-                    'properties': {
-                        'server': 'uuid1',
-                        'actions': ['CREATE', 'UPDATE'],
-                        'config': 'config_uuid',
-                        'input_values': {'foo': 'bar'},
-                        'name': '10_config',
-                        'signal_transport': 'CFN_SIGNAL'
-                    }
-                },
-                "server2": {
-                    'type': 'OS::Heat::SoftwareDeployment',
-                    'properties': {
-                        'server': 'uuid2',
-                        'actions': ['CREATE', 'UPDATE'],
-                        'config': 'config_uuid',
-                        'input_values': {'foo': 'bar'},
-                        'name': '10_config',
-                        'signal_transport': 'CFN_SIGNAL'
-                    }
-                }
-            }
-        }
-
-        self.assertEqual(templ, resg._assemble_nested(['server1',
-                                                       'server2']).t)
+        resg = self._create_group()
+        self.assertEqual(EXPECTED_GROUP_NESTED_TEMPLATE,
+                         resg._assemble_nested(['server1', 'server2']).t)
 
     def test_validate(self):
-        stack = utils.parse_stack(self.template)
-        snip = stack.t.resource_definitions(stack)['deploy_mysql']
-        resg = sd.SoftwareDeploymentGroup('deploy_mysql', snip, stack)
+        resg = self._create_group('deploy_mysql')
         self.assertIsNone(resg.validate())
 
 
@@ -1560,26 +1598,11 @@ class SoftwareDeploymentGroupAttrTest(common.HeatTestCase):
                              values=['attr1', 'attr2'])),
     ]
 
-    template = {
-        'heat_template_version': '2013-05-23',
-        'resources': {
-            'deploy_mysql': {
-                'type': 'OS::Heat::SoftwareDeploymentGroup',
-                'properties': {
-                    'config': 'config_uuid',
-                    'servers': {'server1': 'uuid1', 'server2': 'uuid2'},
-                    'input_values': {'foo': 'bar'},
-                    'name': '10_config'
-                }
-            }
-        }
-    }
-
     def setUp(self):
         super(SoftwareDeploymentGroupAttrTest, self).setUp()
         self.server_names = ['server1', 'server2']
         self.servers = [mock.MagicMock() for s in self.server_names]
-        self.stack = utils.parse_stack(self.template)
+        self.stack = utils.parse_stack(TEMPLATE_GROUP)
 
     def test_attributes(self):
         resg = self.create_dummy_stack()
@@ -1655,21 +1678,6 @@ class SoftwareDeploymentGroupAttrFallbackTest(SoftwareDeploymentGroupAttrTest):
 
 
 class SDGReplaceTest(common.HeatTestCase):
-    template = {
-        'heat_template_version': '2013-05-23',
-        'resources': {
-            'deploy_mysql': {
-                'type': 'OS::Heat::SoftwareDeploymentGroup',
-                'properties': {
-                    'config': 'config_uuid',
-                    'servers': {'server1': 'uuid1', 'server2': 'uuid2'},
-                    'input_values': {'foo': 'bar'},
-                    'name': '10_config'
-                }
-            }
-        }
-    }
-
     # 1. existing > batch_size
     # 2. existing < batch_size
     # 3. count > existing
@@ -1714,7 +1722,7 @@ class SDGReplaceTest(common.HeatTestCase):
 
     def setUp(self):
         super(SDGReplaceTest, self).setUp()
-        self.stack = utils.parse_stack(self.template)
+        self.stack = utils.parse_stack(TEMPLATE_GROUP)
         snip = self.stack.t.resource_definitions(self.stack)['deploy_mysql']
         self.group = sd.SoftwareDeploymentGroup('deploy_mysql',
                                                 snip, self.stack)